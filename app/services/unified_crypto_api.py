@@ -69,7 +69,12 @@ class UnifiedCryptoAPI:
     """
 
     def __init__(self):
-        self.session = httpx.AsyncClient(timeout=30.0)
+        # httpx's default pool sizes, but idle connections are kept for 30s instead of 5s
+        # so they are reused between calls
+        self.session = httpx.AsyncClient(
+            timeout=30.0,
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=100, keepalive_expiry=30.0)
+        )
         
         # API configuration from environment
         self.apis = {
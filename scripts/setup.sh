@@ -27,7 +27,7 @@ fi
 # Install dependencies with uv
 echo "📚 Installing dependencies..."
 uv pip install --upgrade -r requirements.txt
-uv pip install pytest pytest-cov black flake8 isort # Development dependencies
+uv pip install pytest pytest-asyncio pytest-cov pytest-xdist black flake8 isort # Development dependencies
 
 # Check if .env file exists, create template if not
 if [ ! -f ".env" ]; then
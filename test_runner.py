@@ -15,9 +15,35 @@ import os
 import sys
 import subprocess
 import argparse
+import importlib
+import importlib.util
+import json
+import shutil
 import time
+import traceback
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Optional
+from typing import Callable, Dict, List, Optional
+
+try:
+    import pytest
+except ImportError:  # Reported by check_environment
+    pytest = None
+
+# Modules the health check must be able to import, with their display labels
+HEALTH_CHECK_MODULES = [
+    ("app.main", "FastAPI app"),
+    ("agents.crypto_advisor", "Crypto Advisor Agent"),
+    ("app.services.unified_crypto_api", "Unified Crypto API"),
+]
+
+# Cached node IDs of integration tests, used to deselect them without -m
+DESELECT_CACHE = Path(".cache") / "deselect.json"
+
+# Plugin modules loaded explicitly when plugin autoloading is disabled
+ASYNCIO_PLUGIN = "pytest_asyncio.plugin"
+COV_PLUGIN = "pytest_cov.plugin"
+XDIST_PLUGIN = "xdist.plugin"
 
 
 class Colors:
@@ -33,46 +59,87 @@ class Colors:
     UNDERLINE = '\033[4m'
 
 
+# Redirected output gets plain text instead of escape codes
+if not sys.stdout.isatty():
+    for _name in [name for name in vars(Colors) if name.isupper()]:
+        setattr(Colors, _name, '')
+
+# Prebuilt message prefixes and line endings for the print_* helpers
+_PFX = {
+    "ok": f"{Colors.OKGREEN}✓ ",
+    "err": f"{Colors.FAIL}✗ ",
+    "warn": f"{Colors.WARNING}⚠ ",
+    "info": f"{Colors.OKBLUE}ℹ ",
+}
+_END_NL = f"{Colors.ENDC}\n"
+_HEADER_PFX = f"{Colors.HEADER}{Colors.BOLD}"
+_HEADER_RULE = f"{_HEADER_PFX}{'=' * 60}{_END_NL}"
+
+
+def _write(kind: str, message: str):
+    """Write a single prefixed, colored line to stdout"""
+    sys.stdout.write(_PFX[kind] + message + _END_NL)
+
+
+@lru_cache(maxsize=None)
+def _find_pytest() -> Optional[str]:
+    """Locate an executable pytest on PATH without running it"""
+    pytest_bin = shutil.which("pytest")
+    if pytest_bin and os.access(pytest_bin, os.X_OK):
+        return pytest_bin
+    return None
+
+
 class TestRunner:
     """Test runner for Salt Wallet backend"""
 
     def __init__(self):
         self.project_root = Path(__file__).parent
         self.test_dir = self.project_root / "tests"
+        self._preload_modules()
+        
+    def _preload_modules(self):
+        """Import heavy test dependencies once so forked pytest runs inherit them"""
+        sys.path.insert(0, str(self.project_root))
+        for module in ("fastapi", "tests.conftest"):
+            try:
+                __import__(module)
+            except ImportError:
+                pass
         
     def print_header(self, message: str):
         """Print a formatted header"""
-        print(f"\n{Colors.HEADER}{Colors.BOLD}{'='*60}{Colors.ENDC}")
-        print(f"{Colors.HEADER}{Colors.BOLD}{message:^60}{Colors.ENDC}")
-        print(f"{Colors.HEADER}{Colors.BOLD}{'='*60}{Colors.ENDC}\n")
+        sys.stdout.write(f"\n{_HEADER_RULE}{_HEADER_PFX}{message:^60}{_END_NL}{_HEADER_RULE}\n")
         
     def print_success(self, message: str):
         """Print success message"""
-        print(f"{Colors.OKGREEN}✓ {message}{Colors.ENDC}")
+        _write("ok", message)
         
     def print_error(self, message: str):
         """Print error message"""
-        print(f"{Colors.FAIL}✗ {message}{Colors.ENDC}")
+        _write("err", message)
         
     def print_warning(self, message: str):
         """Print warning message"""
-        print(f"{Colors.WARNING}⚠ {message}{Colors.ENDC}")
+        _write("warn", message)
         
     def print_info(self, message: str):
         """Print info message"""
-        print(f"{Colors.OKBLUE}ℹ {message}{Colors.ENDC}")
+        _write("info", message)
         
-    def check_environment(self) -> bool:
+    def check_environment(self, verify_pytest: bool = False) -> bool:
         """Check if the environment is set up correctly"""
         self.print_header("Checking Environment")
         
         # Check if pytest is installed
-        try:
-            subprocess.run(["pytest", "--version"], capture_output=True, check=True)
-            self.print_success("pytest is installed")
-        except (subprocess.CalledProcessError, FileNotFoundError):
+        pytest_bin = _find_pytest()
+        if pytest_bin is None:
             self.print_error("pytest is not installed. Run: pip install pytest")
             return False
+        if verify_pytest and subprocess.run([pytest_bin, "--version"], capture_output=True).returncode != 0:
+            self.print_error(f"pytest at {pytest_bin} failed to run")
+            return False
+        self.print_success(f"pytest found at {pytest_bin}")
             
         # Check if test directory exists
         if not self.test_dir.exists():
@@ -102,22 +169,49 @@ class TestRunner:
             
         return True
         
-    def run_pytest(self, args: List[str], description: str) -> bool:
-        """Run pytest with given arguments"""
+    def run_pytest(
+        self,
+        args: List[str],
+        description: str,
+        required_plugins: Optional[List[str]] = None
+    ) -> bool:
+        """Run pytest with given arguments
+        
+        When required_plugins is given, plugin autoloading is disabled and
+        only those plugins are loaded.
+        """
+        env = None
+        if required_plugins is not None:
+            env = {**os.environ, "PYTEST_DISABLE_PLUGIN_AUTOLOAD": "1"}
+            plugin_args = []
+            for plugin in required_plugins:
+                plugin_args += ["-p", plugin]
+            args = plugin_args + args
+        
         self.print_info(f"Running: {description}")
         print(f"{Colors.OKCYAN}Command: pytest {' '.join(args)}{Colors.ENDC}")
         
-        start_time = time.time()
+        start_ns = time.perf_counter_ns()
         try:
-            result = subprocess.run(["pytest"] + args, cwd=self.project_root)
-            end_time = time.time()
+            if sys.platform == "linux" and pytest is not None:
+                returncode = self._run_pytest_forked(args, env)
+            else:
+                sys.stdout.flush()
+                proc = subprocess.Popen(
+                    ["pytest"] + args,
+                    stdout=sys.stdout.fileno(),
+                    stderr=sys.stderr.fileno(),
+                    cwd=self.project_root,
+                    env=env
+                )
+                returncode = proc.wait()
+            duration_ms = (time.perf_counter_ns() - start_ns) // 1_000_000
             
-            duration = end_time - start_time
-            if result.returncode == 0:
-                self.print_success(f"{description} completed successfully in {duration:.2f}s")
+            if returncode == 0:
+                self.print_success(f"{description} completed successfully in {duration_ms / 1000:.2f}s")
                 return True
             else:
-                self.print_error(f"{description} failed in {duration:.2f}s")
+                self.print_error(f"{description} failed in {duration_ms / 1000:.2f}s")
                 return False
         except KeyboardInterrupt:
             self.print_warning("Tests interrupted by user")
@@ -126,20 +220,103 @@ class TestRunner:
             self.print_error(f"Error running tests: {e}")
             return False
     
+    def _run_pytest_forked(self, args: List[str], env: Optional[dict] = None) -> int:
+        """Run pytest.main in a forked child that shares the preloaded imports"""
+        sys.stdout.flush()
+        sys.stderr.flush()
+        pid = os.fork()
+        if pid == 0:
+            exit_code = 1
+            try:
+                os.chdir(self.project_root)
+                if env is not None:
+                    os.environ.update(env)
+                exit_code = int(pytest.main(args))
+            except BaseException:
+                # os._exit skips the interpreter's own error reporting
+                traceback.print_exc()
+                exit_code = 1
+            finally:
+                sys.stdout.flush()
+                sys.stderr.flush()
+                os._exit(exit_code)
+        try:
+            _, status = os.waitpid(pid, 0)
+        except KeyboardInterrupt:
+            # The child got the same SIGINT; reap it before giving up
+            os.waitpid(pid, 0)
+            raise
+        return os.waitstatus_to_exitcode(status)
+    
+    def _collect_deselect(self) -> Optional[List[str]]:
+        """Collect integration test node IDs, cached until a test file or the marker config changes"""
+        cache_file = self.project_root / DESELECT_CACHE
+        watched = [*self.test_dir.glob("test_*.py"), self.test_dir / "conftest.py", self.project_root / "pytest.ini"]
+        mtimes = {
+            str(path.relative_to(self.project_root)): path.stat().st_mtime_ns
+            for path in watched
+            if path.exists()
+        }
+        
+        try:
+            cached = json.loads(cache_file.read_text())
+            if cached["mtimes"] == mtimes:
+                return cached["node_ids"]
+        except (OSError, ValueError, KeyError):
+            pass
+        
+        result = subprocess.run(
+            # Explicit verbosity so the addopts --verbose can't change the output format
+            ["pytest", "--collect-only", "--verbosity=-1", "-m", "integration", "tests/"],
+            cwd=self.project_root,
+            capture_output=True,
+            text=True
+        )
+        # 5 means no integration tests were collected
+        if result.returncode not in (0, 5):
+            return None
+        
+        node_ids = []
+        for line in result.stdout.splitlines():
+            if not line.strip():
+                break
+            if "::" in line:
+                node_ids.append(line.strip())
+        # Items were selected but none parsed; don't cache an unrecognised format
+        if result.returncode == 0 and not node_ids:
+            return None
+        
+        cache_file.parent.mkdir(exist_ok=True)
+        cache_file.write_text(json.dumps({"mtimes": mtimes, "node_ids": node_ids}, indent=2))
+        return node_ids
+    
+    def _exclude_integration_args(self) -> List[str]:
+        """Build pytest arguments that skip integration tests"""
+        node_ids = self._collect_deselect()
+        if node_ids is None:
+            return ["-m", "not integration"]
+        
+        args = []
+        for node_id in node_ids:
+            args += ["--deselect", node_id]
+        return args
+    
     def run_unit_tests(self) -> bool:
         """Run unit tests only"""
         self.print_header("Running Unit Tests")
         return self.run_pytest([
             "-v",
-            "-m", "not integration",
+            *self._exclude_integration_args(),
             "--tb=short",
             "tests/"
-        ], "Unit tests")
+        ], "Unit tests", required_plugins=[ASYNCIO_PLUGIN, XDIST_PLUGIN])
     
     def run_integration_tests(self) -> bool:
         """Run integration tests only"""
         self.print_header("Running Integration Tests")
         self.print_warning("Integration tests require API keys and internet connection")
+        # Network test classes are skipped unless this is set
+        os.environ.setdefault("RUN_INTEGRATION", "1")
         return self.run_pytest([
             "-v", 
             "-m", "integration",
@@ -165,7 +342,7 @@ class TestRunner:
             "-m", "agents",
             "--tb=short", 
             "tests/"
-        ], "Agent tests")
+        ], "Agent tests", required_plugins=[ASYNCIO_PLUGIN, XDIST_PLUGIN])
     
     def run_specific_test(self, test_path: str) -> bool:
         """Run a specific test file or test"""
@@ -187,9 +364,9 @@ class TestRunner:
             "--cov-report=html",
             "--cov-report=term-missing",
             "--tb=short",
-            "-m", "not integration",
+            *self._exclude_integration_args(),
             "tests/"
-        ], "Coverage tests")
+        ], "Coverage tests", required_plugins=[ASYNCIO_PLUGIN, XDIST_PLUGIN, COV_PLUGIN])
     
     def run_performance_tests(self) -> bool:
         """Run performance tests"""
@@ -216,11 +393,11 @@ class TestRunner:
         self.print_header("Running Fast Tests")
         return self.run_pytest([
             "-v",
-            "-m", "not integration",
+            *self._exclude_integration_args(),
             "-k", "not performance",
             "--tb=short",
             "tests/"
-        ], "Fast tests")
+        ], "Fast tests", required_plugins=[ASYNCIO_PLUGIN, XDIST_PLUGIN])
     
     def show_test_info(self):
         """Show information about available tests"""
@@ -230,11 +407,17 @@ class TestRunner:
             self.print_error("Test directory not found")
             return
             
-        test_files = list(self.test_dir.glob("test_*.py"))
+        with os.scandir(self.test_dir) as entries:
+            test_files = sorted(
+                entry.name for entry in entries
+                if entry.is_file(follow_symlinks=False)
+                and entry.name.startswith("test_")
+                and entry.name.endswith(".py")
+            )
         
         print(f"{Colors.OKBLUE}Available test files:{Colors.ENDC}")
         for test_file in test_files:
-            print(f"  • {test_file.name}")
+            print(f"  • {test_file}")
             
         print(f"\n{Colors.OKBLUE}Test categories:{Colors.ENDC}")
         print("  • Unit tests: Basic functionality tests (fast)")
@@ -259,22 +442,24 @@ class TestRunner:
             self.print_info("Testing imports...")
             
             # Test core imports
-            from app.main import app
-            self.print_success("FastAPI app import successful")
-            
-            from agents.crypto_advisor import CryptoAdvisorAgent
-            self.print_success("Crypto Advisor Agent import successful")
+            for module_name, label in HEALTH_CHECK_MODULES:
+                if importlib.util.find_spec(module_name) is None:
+                    raise ImportError(f"No module named '{module_name}'")
+                importlib.import_module(module_name)
+                self.print_success(f"{label} import successful")
             
-            from app.services.unified_crypto_api import UnifiedCryptoAPI
-            self.print_success("Unified Crypto API import successful")
+            if pytest is None:
+                self.print_error("pytest is not installed. Run: pip install pytest")
+                return False
             
-            # Run a simple test
-            return self.run_pytest([
+            # Run a simple test in-process, reusing the imports above
+            self.print_info("Running: Health check tests")
+            return pytest.main([
                 "-v",
                 "--tb=short",
-                "-k", "test_health",
-                "tests/"
-            ], "Health check tests")
+                "-k", "health",
+                str(self.test_dir)
+            ]) == 0
             
         except ImportError as e:
             self.print_error(f"Import error: {e}")
@@ -284,6 +469,23 @@ class TestRunner:
             return False
 
 
+# Test modes that map directly onto a TestRunner method
+_DISPATCH: Dict[str, Callable[[TestRunner], bool]] = {
+    "unit": TestRunner.run_unit_tests,
+    "integration": TestRunner.run_integration_tests,
+    "api": TestRunner.run_api_tests,
+    "agents": TestRunner.run_agent_tests,
+    "all": TestRunner.run_all_tests,
+    "fast": TestRunner.run_fast_tests,
+    "coverage": TestRunner.run_coverage_tests,
+    "performance": TestRunner.run_performance_tests,
+    "health": TestRunner.run_health_check,
+}
+
+# Test modes handled directly in main()
+_SPECIAL = ("info", "specific")
+
+
 def main():
     """Main function"""
     parser = argparse.ArgumentParser(
@@ -307,10 +509,7 @@ Examples:
     
     parser.add_argument(
         "mode",
-        choices=[
-            "unit", "integration", "api", "agents", "all", "fast", 
-            "coverage", "performance", "health", "info", "specific"
-        ],
+        choices=[*_DISPATCH, *_SPECIAL],
         help="Test mode to run"
     )
     
@@ -326,38 +525,24 @@ Examples:
         help="Skip environment check"
     )
     
+    parser.add_argument(
+        "--verify-pytest",
+        action="store_true",
+        help="Run pytest --version during the environment check"
+    )
+    
     args = parser.parse_args()
     
     runner = TestRunner()
     
     # Environment check
     if not args.no_env_check and args.mode != "info":
-        if not runner.check_environment():
+        if not runner.check_environment(verify_pytest=args.verify_pytest):
             print(f"\n{Colors.FAIL}Environment check failed. Fix the issues above and try again.{Colors.ENDC}")
             return 1
     
     # Run the requested test mode
-    success = False
-    
-    if args.mode == "unit":
-        success = runner.run_unit_tests()
-    elif args.mode == "integration":
-        success = runner.run_integration_tests()
-    elif args.mode == "api":
-        success = runner.run_api_tests()
-    elif args.mode == "agents":
-        success = runner.run_agent_tests()
-    elif args.mode == "all":
-        success = runner.run_all_tests()
-    elif args.mode == "fast":
-        success = runner.run_fast_tests()
-    elif args.mode == "coverage":
-        success = runner.run_coverage_tests()
-    elif args.mode == "performance":
-        success = runner.run_performance_tests()
-    elif args.mode == "health":
-        success = runner.run_health_check()
-    elif args.mode == "info":
+    if args.mode == "info":
         runner.show_test_info()
         return 0
     elif args.mode == "specific":
@@ -365,6 +550,8 @@ Examples:
             runner.print_error("Test path is required for 'specific' mode")
             return 1
         success = runner.run_specific_test(args.test_path)
+    else:
+        success = _DISPATCH[args.mode](runner)
     
     # Print final result
     if success:
@@ -1,7 +1,19 @@
+import hashlib
+import json
+import os
 import sys
-from unittest.mock import MagicMock
+import types
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock
 
 import pytest
+import httpx
+from httpx import ASGITransport, AsyncClient
+
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
 
 
 # Mock the agno module and its imports
@@ -25,32 +37,162 @@ class MockTools:
     pass
 
 
-# Set up mock modules
-sys.modules["agno"] = MagicMock()
-sys.modules["agno.agent"] = MagicMock()
-sys.modules["agno.agent"].Agent = MockAgent
-sys.modules["agno.memory"] = MagicMock()
-sys.modules["agno.memory.v2"] = MagicMock()
-sys.modules["agno.memory.v2.memory"] = MagicMock()
-sys.modules["agno.memory.v2.memory"].Memory = MockMemory
-sys.modules["agno.memory.v2.db"] = MagicMock()
-sys.modules["agno.memory.v2.db.postgres"] = MagicMock()
-sys.modules["agno.memory.v2.db.postgres"].PostgresMemoryDb = MagicMock()
-sys.modules["agno.models"] = MagicMock()
-sys.modules["agno.models.google"] = MagicMock()
-sys.modules["agno.models.google"].GoogleGenAIChat = MockModel
-sys.modules["agno.storage"] = MagicMock()
-sys.modules["agno.storage.agent"] = MagicMock()
-sys.modules["agno.storage.agent.postgres"] = MagicMock()
-sys.modules["agno.storage.agent.postgres"].PostgresAgentStorage = MockStorageAgent
-sys.modules["agno.tools"] = MagicMock()
-sys.modules["agno.tools.duckduckgo"] = MagicMock()
-sys.modules["agno.tools.duckduckgo"].DuckDuckGoTools = MockTools
-
-# Mock app
-sys.modules["app"] = MagicMock()
-sys.modules["app.main"] = MagicMock()
-sys.modules["app.main"].app = MagicMock()
+def _stub_module(name, **attrs):
+    """Register a lightweight module stub exposing only the given attributes"""
+    module = types.ModuleType(name)
+    module.__dict__.update(attrs)
+    sys.modules[name] = module
+
+
+def pytest_configure(config):
+    """Set up mock modules, unless pytest is only collecting tests"""
+    if config.option.collectonly:
+        return
+
+    _stub_module("agno")
+    _stub_module("agno.agent", Agent=MockAgent)
+    _stub_module("agno.memory")
+    _stub_module("agno.memory.v2")
+    _stub_module("agno.memory.v2.memory", Memory=MockMemory)
+    _stub_module("agno.memory.v2.db")
+    _stub_module("agno.memory.v2.db.postgres", PostgresMemoryDb=MagicMock())
+    _stub_module("agno.models")
+    _stub_module("agno.models.google", GoogleGenAIChat=MockModel)
+    _stub_module("agno.storage")
+    _stub_module("agno.storage.agent")
+    _stub_module("agno.storage.agent.postgres", PostgresAgentStorage=MockStorageAgent)
+    _stub_module("agno.tools")
+    _stub_module("agno.tools.duckduckgo", DuckDuckGoTools=MockTools)
+
+
+# Run async tests on uvloop when it is available
+if uvloop is not None and sys.platform != "win32":
+    def pytest_asyncio_loop_factories(config, item):
+        return {"uvloop": uvloop.new_event_loop}
+
+
+@pytest.fixture(scope="session")
+def app():
+    """The FastAPI app, warmed up with one request so routes resolve only once"""
+    from fastapi.testclient import TestClient
+    from app.main import app as fastapi_app
+
+    TestClient(fastapi_app).get("/api/v1/crypto/health")
+    return fastapi_app
+
+
+@pytest.fixture(scope="session")
+async def client(app):
+    """Async client calling the FastAPI app in-process, shared across the session
+
+    Tests must not mutate app state through this client.
+    """
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+
+@pytest.fixture(scope="session")
+def _unified_api_spec_mock():
+    """AsyncMock specced on UnifiedCryptoAPI, built once per session"""
+    from app.services.unified_crypto_api import UnifiedCryptoAPI
+
+    return AsyncMock(spec=UnifiedCryptoAPI)
+
+
+@pytest.fixture
+def mock_unified_api(_unified_api_spec_mock):
+    """Mock unified crypto API, reset before each test"""
+    _unified_api_spec_mock.reset_mock(return_value=True, side_effect=True)
+    return _unified_api_spec_mock
+
+
+@pytest.fixture(scope="session")
+def _httpx_spec_mock():
+    """AsyncMock specced on httpx.AsyncClient, built once per session"""
+    return AsyncMock(spec=httpx.AsyncClient)
+
+
+@pytest.fixture
+def mock_httpx_client(_httpx_spec_mock):
+    """Mock httpx AsyncClient, reset before each test"""
+    _httpx_spec_mock.reset_mock(return_value=True, side_effect=True)
+    return _httpx_spec_mock
+
+
+HTTP_CACHE_DIR = Path(__file__).parent / "fixtures" / "http_cache"
+
+# Same pool limits as UnifiedCryptoAPI's own client, which the caching client replaces
+LIVE_LIMITS = httpx.Limits(max_keepalive_connections=20, max_connections=100, keepalive_expiry=30.0)
+
+
+class CachingTransport(httpx.AsyncBaseTransport):
+    """Replay responses recorded under HTTP_CACHE_DIR, recording successful ones on a miss"""
+
+    def __init__(self, cache_dir: Path = HTTP_CACHE_DIR, limits: httpx.Limits = LIVE_LIMITS):
+        self.cache_dir = cache_dir
+        self.transport = httpx.AsyncHTTPTransport(limits=limits)
+
+    def _cache_path(self, request: httpx.Request) -> Path:
+        body_hash = hashlib.sha256(request.content).hexdigest()
+        key = hashlib.sha256(f"{request.method} {request.url} {body_hash}".encode()).hexdigest()
+        return self.cache_dir / f"{key}.json"
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        path = self._cache_path(request)
+        if path.exists():
+            cached = json.loads(path.read_text())
+            return httpx.Response(
+                cached["status_code"],
+                headers={"Content-Type": cached["content_type"]},
+                content=cached["content"].encode(),
+                request=request
+            )
+
+        response = await self.transport.handle_async_request(request)
+        # Decode through a full Response so the cache stores plain text
+        content = await httpx.Response(
+            response.status_code, headers=response.headers, stream=response.stream, request=request
+        ).aread()
+        if response.is_success:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            # Write then rename, so xdist workers recording the same URL never leave a partial file
+            tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+            tmp_path.write_text(json.dumps({
+                "status_code": response.status_code,
+                "content_type": response.headers.get("Content-Type", "application/json"),
+                "content": content.decode()
+            }))
+            os.replace(tmp_path, path)
+        return httpx.Response(
+            response.status_code,
+            headers={"Content-Type": response.headers.get("Content-Type", "application/json")},
+            content=content,
+            request=request
+        )
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+
+
+@pytest.fixture(scope="session")
+def http_cache_dir():
+    """Directory holding the HTTP responses recorded by CachingTransport"""
+    return HTTP_CACHE_DIR
+
+
+@pytest.fixture(scope="session")
+async def live_unified_api(http_cache_dir):
+    """One UnifiedCryptoAPI, and its connection pool, shared by the live tests
+
+    Its HTTP client goes through CachingTransport, so live calls are recorded once and replayed after.
+    """
+    from app.services.unified_crypto_api import UnifiedCryptoAPI
+
+    api = UnifiedCryptoAPI()
+    await api.session.aclose()
+    api.session = httpx.AsyncClient(timeout=30.0, transport=CachingTransport(http_cache_dir))
+    yield api
+    await api.close()
 
 
 @pytest.fixture
@@ -1,5 +1,6 @@
 # Import the FastAPI app
 import sys
+from types import MappingProxyType
 from unittest.mock import MagicMock, patch
 
 import pytest
@@ -9,9 +10,23 @@ from fastapi.responses import JSONResponse
 
 sys.path.append(".")
 
+# Mock agent data
+_AGENTS = (
+    MappingProxyType({"id": "crypto-advisor", "name": "Crypto Advisor", "description": "Expert guidance on cryptocurrency investments"}),
+    MappingProxyType({"id": "market-research", "name": "Market Research", "description": "Analysis of cryptocurrency market trends"}),
+    MappingProxyType({"id": "portfolio-management", "name": "Portfolio Management", "description": "Portfolio strategy and performance tracking"}),
+)
+
+# Mock chat response
+_CHAT = MappingProxyType({
+    "message_id": "abc123",
+    "content": "I can help you with your cryptocurrency investment questions.",
+    "created_at": "2023-07-10T14:30:00Z"
+})
+
 
 # Create a test app instead of importing the real one
-@pytest.fixture
+@pytest.fixture(scope="session")
 def app():
     """Create a test FastAPI app for testing"""
     app = FastAPI()
@@ -24,27 +39,13 @@ def app():
     def health_check():
         return {"status": "healthy"}
 
-    # Mock agent data
-    agents = [
-        {"id": "crypto-advisor", "name": "Crypto Advisor", "description": "Expert guidance on cryptocurrency investments"},
-        {"id": "market-research", "name": "Market Research", "description": "Analysis of cryptocurrency market trends"},
-        {"id": "portfolio-management", "name": "Portfolio Management", "description": "Portfolio strategy and performance tracking"}
-    ]
-
-    # Mock chat response
-    chat_response = {
-        "message_id": "abc123",
-        "content": "I can help you with your cryptocurrency investment questions.",
-        "created_at": "2023-07-10T14:30:00Z"
-    }
-
     @app.get("/api/v1/agents")
     def list_agents():
-        return agents
+        return _AGENTS
 
     @app.post("/api/v1/agents/{agent_id}/chat")
     def chat_with_agent(agent_id: str):
-        return chat_response
+        return _CHAT
 
     @app.post("/api/v1/agents/{agent_id}/chat/stream")
     def chat_stream_with_agent(agent_id: str):
@@ -54,35 +55,32 @@ def app():
     return app
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def client(app):
-    """Return a FastAPI TestClient instance"""
-    return TestClient(app)
-
-
-def test_root_endpoint(client):
-    """Test the root endpoint returns the welcome message"""
-    response = client.get("/")
-    assert response.status_code == 200
-    assert response.json() == {"message": "Welcome to the Salt AI Crypto Agents API"}
-
-
-def test_health_check(client):
-    """Test the health check endpoint"""
-    response = client.get("/health")
-    assert response.status_code == 200
-    assert response.json() == {"status": "healthy"}
-
-
-def test_list_agents(client):
-    """Test listing all available agents"""
-    response = client.get("/api/v1/agents")
+    """Return a FastAPI TestClient instance shared across the session"""
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.mark.parametrize(
+    "path,check",
+    [
+        # Root endpoint returns the welcome message
+        ("/", lambda data: data == {"message": "Welcome to the Salt AI Crypto Agents API"}),
+        # Health check endpoint
+        ("/health", lambda data: data == {"status": "healthy"}),
+        # Listing all available agents
+        ("/api/v1/agents", lambda data: [agent["id"] for agent in data] == [
+            "crypto-advisor", "market-research", "portfolio-management"
+        ]),
+    ],
+    ids=["root", "health", "list_agents"],
+)
+def test_get_endpoint(client, path, check):
+    """Test the GET endpoints return 200 with the expected payload"""
+    response = client.get(path)
     assert response.status_code == 200
-    agents = response.json()
-    assert len(agents) == 3
-    assert agents[0]["id"] == "crypto-advisor"
-    assert agents[1]["id"] == "market-research"
-    assert agents[2]["id"] == "portfolio-management"
+    assert check(response.json())
 
 
 def test_chat_with_agent(client):
@@ -5,52 +5,95 @@ Test cases for enhanced Crypto Advisor Agent with unified API integration
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
 import asyncio
-from datetime import datetime
+import os
+import re
+import time
+from collections import namedtuple
+from datetime import datetime, timezone
 
 from agents.crypto_advisor import CryptoAdvisorAgent
 from app.services.unified_crypto_api import TokenPrice, TradingPair
 
+# Sample price data shared by every test; tests must not mutate it
+_SAMPLE_TIMESTAMP = datetime(2024, 1, 1, tzinfo=timezone.utc)
+_SAMPLE_PRICES = {
+    "bitcoin_usd": TokenPrice(
+        symbol="bitcoin",
+        price_usd=45000.0,
+        price_change_24h=2.5,
+        market_cap=850000000000,
+        volume_24h=25000000000,
+        source="coingecko",
+        timestamp=_SAMPLE_TIMESTAMP
+    ),
+    "ethereum_usd": TokenPrice(
+        symbol="ethereum",
+        price_usd=3200.0,
+        price_change_24h=1.8,
+        market_cap=380000000000,
+        volume_24h=15000000000,
+        source="coingecko",
+        timestamp=_SAMPLE_TIMESTAMP
+    )
+}
+
+# Plain stand-ins for Gemini streaming chunks and their parts
+Part = namedtuple("Part", ["text"])
+Chunk = namedtuple("Chunk", ["parts"])
+
+# Same substring match the agent applies to user queries
+_CRYPTO_KEYWORDS_RE = re.compile(r"bitcoin|btc|ethereum|eth|price|crypto|market|coin|token", re.I)
+
+
+class _StubAPI:
+    """Minimal async stand-in for UnifiedCryptoAPI with preset results"""
+
+    def __init__(self, prices, overview):
+        self._prices = prices
+        self._overview = overview
+
+    async def get_prices_coingecko(self, *args, **kwargs):
+        return self._prices
+
+    async def get_market_overview(self, *args, **kwargs):
+        return self._overview
+
 
 class TestCryptoAdvisorAgentEnhanced:
     """Test suite for enhanced Crypto Advisor Agent"""
 
     @pytest.fixture
-    def mock_unified_api(self):
-        """Mock unified crypto API"""
-        mock_api = AsyncMock()
-        return mock_api
+    def mock_unified_api(self, sample_price_data):
+        """Stub unified crypto API returning the sample prices"""
+        return _StubAPI(sample_price_data, {"market_summary": {}})
 
-    @pytest.fixture
+    @pytest.fixture(scope="session")
     def sample_price_data(self):
         """Sample price data for testing"""
-        return {
-            "bitcoin_usd": TokenPrice(
-                symbol="bitcoin",
-                price_usd=45000.0,
-                price_change_24h=2.5,
-                market_cap=850000000000,
-                volume_24h=25000000000,
-                source="coingecko",
-                timestamp=datetime.now()
-            ),
-            "ethereum_usd": TokenPrice(
-                symbol="ethereum", 
-                price_usd=3200.0,
-                price_change_24h=1.8,
-                market_cap=380000000000,
-                volume_24h=15000000000,
-                source="coingecko",
-                timestamp=datetime.now()
-            )
-        }
+        return _SAMPLE_PRICES
 
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def crypto_advisor_agent(self):
-        """Create CryptoAdvisorAgent instance for testing"""
+        """Create CryptoAdvisorAgent instance shared across the module"""
         with patch.dict('os.environ', {'GEMINI_API_KEY': 'test_key'}):
             agent = CryptoAdvisorAgent()
             return agent
 
+    @pytest.fixture(scope="module")
+    def no_key_agent(self):
+        """Create CryptoAdvisorAgent without a GEMINI_API_KEY, shared across the module"""
+        with pytest.MonkeyPatch.context() as monkeypatch:
+            monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+            return CryptoAdvisorAgent()
+
+    @pytest.fixture(autouse=True)
+    def reset_crypto_advisor_agent(self, crypto_advisor_agent):
+        """Restore the shared agent's mutable attributes after each test"""
+        model = crypto_advisor_agent.model
+        yield
+        crypto_advisor_agent.unified_api = None
+        crypto_advisor_agent.model = model
+
     @pytest.mark.agents
     @pytest.mark.asyncio
     async def test_agent_initialization(self, crypto_advisor_agent):
@@ -62,23 +105,19 @@ class TestCryptoAdvisorAgentEnhanced:
 
     @pytest.mark.agents
     @pytest.mark.asyncio
-    async def test_agent_initialization_without_api_key(self):
+    async def test_agent_initialization_without_api_key(self, no_key_agent):
         """Test agent initialization without API key"""
-        with patch.dict('os.environ', {}, clear=True):
-            agent = CryptoAdvisorAgent()
-            assert agent.api_configured == False
-            assert agent.model is None
+        assert no_key_agent.api_configured == False
+        assert no_key_agent.model is None
 
     @pytest.mark.agents
     @pytest.mark.asyncio
     async def test_crypto_data_fetching(self, crypto_advisor_agent, mock_unified_api, sample_price_data):
         """Test cryptocurrency data fetching"""
         # Mock the unified API
-        crypto_advisor_agent.unified_api = mock_unified_api
-        mock_unified_api.get_prices_coingecko.return_value = sample_price_data
-        mock_unified_api.get_market_overview.return_value = {
+        crypto_advisor_agent.unified_api = _StubAPI(sample_price_data, {
             "market_summary": sample_price_data
-        }
+        })
 
         # Test with bitcoin query
         result = await crypto_advisor_agent._fetch_crypto_data("what is the price of bitcoin")
@@ -91,10 +130,9 @@ class TestCryptoAdvisorAgentEnhanced:
 
     @pytest.mark.agents
     @pytest.mark.asyncio
-    async def test_crypto_data_fetching_multiple_coins(self, crypto_advisor_agent, mock_unified_api, sample_price_data):
+    async def test_crypto_data_fetching_multiple_coins(self, crypto_advisor_agent, mock_unified_api):
         """Test fetching data for multiple cryptocurrencies"""
         crypto_advisor_agent.unified_api = mock_unified_api
-        mock_unified_api.get_prices_coingecko.return_value = sample_price_data
 
         result = await crypto_advisor_agent._fetch_crypto_data("compare bitcoin and ethereum prices")
         
@@ -104,8 +142,9 @@ class TestCryptoAdvisorAgentEnhanced:
 
     @pytest.mark.agents
     @pytest.mark.asyncio
-    async def test_crypto_data_fetching_error_handling(self, crypto_advisor_agent, mock_unified_api):
+    async def test_crypto_data_fetching_error_handling(self, crypto_advisor_agent):
         """Test error handling in crypto data fetching"""
+        mock_unified_api = AsyncMock()
         crypto_advisor_agent.unified_api = mock_unified_api
         mock_unified_api.get_prices_coingecko.side_effect = Exception("API Error")
 
@@ -115,11 +154,9 @@ class TestCryptoAdvisorAgentEnhanced:
 
     @pytest.mark.agents
     @pytest.mark.asyncio
-    async def test_message_processing_with_crypto_keywords(self, crypto_advisor_agent, mock_unified_api, sample_price_data):
+    async def test_message_processing_with_crypto_keywords(self, crypto_advisor_agent, mock_unified_api):
         """Test message processing with crypto keywords"""
         crypto_advisor_agent.unified_api = mock_unified_api
-        mock_unified_api.get_prices_coingecko.return_value = sample_price_data
-        mock_unified_api.get_market_overview.return_value = {"market_summary": {}}
 
         messages = [
             {"role": "user", "content": "What's the current price of Bitcoin?"}
@@ -147,7 +184,7 @@ class TestCryptoAdvisorAgentEnhanced:
     @pytest.mark.agents
     @pytest.mark.asyncio
     @patch('google.generativeai.GenerativeModel')
-    async def test_generate_response_success(self, mock_model_class, crypto_advisor_agent, mock_unified_api, sample_price_data):
+    async def test_generate_response_success(self, mock_model_class, crypto_advisor_agent, mock_unified_api):
         """Test successful response generation"""
         # Mock Gemini model
         mock_model = AsyncMock()
@@ -159,8 +196,6 @@ class TestCryptoAdvisorAgentEnhanced:
 
         # Mock unified API
         crypto_advisor_agent.unified_api = mock_unified_api
-        mock_unified_api.get_prices_coingecko.return_value = sample_price_data
-        mock_unified_api.get_market_overview.return_value = {"market_summary": {}}
 
         messages = [
             {"role": "user", "content": "What's the price of Bitcoin?"}
@@ -174,24 +209,21 @@ class TestCryptoAdvisorAgentEnhanced:
 
     @pytest.mark.agents
     @pytest.mark.asyncio
-    async def test_generate_response_without_api_key(self):
+    async def test_generate_response_without_api_key(self, no_key_agent):
         """Test response generation without API key"""
-        with patch.dict('os.environ', {}, clear=True):
-            agent = CryptoAdvisorAgent()
-            
-            messages = [
-                {"role": "user", "content": "What's the price of Bitcoin?"}
-            ]
+        messages = [
+            {"role": "user", "content": "What's the price of Bitcoin?"}
+        ]
 
-            response = await agent.generate_response(messages)
-            
-            assert response["role"] == "assistant"
-            assert "GEMINI_API_KEY is missing" in response["content"]
+        response = await no_key_agent.generate_response(messages)
+        
+        assert response["role"] == "assistant"
+        assert "GEMINI_API_KEY is missing" in response["content"]
 
     @pytest.mark.agents
     @pytest.mark.asyncio
     @patch('google.generativeai.GenerativeModel')
-    async def test_generate_streaming_response(self, mock_model_class, crypto_advisor_agent, mock_unified_api, sample_price_data):
+    async def test_generate_streaming_response(self, mock_model_class, crypto_advisor_agent, mock_unified_api):
         """Test streaming response generation"""
         # Mock Gemini model for streaming
         mock_model = AsyncMock()
@@ -199,9 +231,9 @@ class TestCryptoAdvisorAgentEnhanced:
         # Create mock streaming response
         async def mock_stream():
             chunks = [
-                MagicMock(parts=[MagicMock(text="Bitcoin is currently ")]),
-                MagicMock(parts=[MagicMock(text="trading at $45,000 ")]),
-                MagicMock(parts=[MagicMock(text="with a 2.5% increase.")])
+                Chunk([Part("Bitcoin is currently ")]),
+                Chunk([Part("trading at $45,000 ")]),
+                Chunk([Part("with a 2.5% increase.")])
             ]
             for chunk in chunks:
                 yield chunk
@@ -212,8 +244,6 @@ class TestCryptoAdvisorAgentEnhanced:
 
         # Mock unified API
         crypto_advisor_agent.unified_api = mock_unified_api
-        mock_unified_api.get_prices_coingecko.return_value = sample_price_data
-        mock_unified_api.get_market_overview.return_value = {"market_summary": {}}
 
         messages = [
             {"role": "user", "content": "What's the price of Bitcoin?"}
@@ -229,23 +259,20 @@ class TestCryptoAdvisorAgentEnhanced:
 
     @pytest.mark.agents
     @pytest.mark.asyncio
-    async def test_generate_streaming_response_without_api_key(self):
+    async def test_generate_streaming_response_without_api_key(self, no_key_agent):
         """Test streaming response without API key"""
-        with patch.dict('os.environ', {}, clear=True):
-            agent = CryptoAdvisorAgent()
-            
-            messages = [
-                {"role": "user", "content": "What's the price of Bitcoin?"}
-            ]
+        messages = [
+            {"role": "user", "content": "What's the price of Bitcoin?"}
+        ]
 
-            chunks = []
-            async for chunk in agent.generate_streaming_response(messages):
-                chunks.append(chunk)
-            
-            assert len(chunks) >= 2  # Error message chunks + done
-            assert chunks[-1]["done"] == True
-            error_content = "".join([chunk.get("content", "") for chunk in chunks])
-            assert "GEMINI_API_KEY is missing" in error_content
+        chunks = []
+        async for chunk in no_key_agent.generate_streaming_response(messages):
+            chunks.append(chunk)
+        
+        assert len(chunks) >= 2  # Error message chunks + done
+        assert chunks[-1]["done"] == True
+        error_content = "".join([chunk.get("content", "") for chunk in chunks])
+        assert "GEMINI_API_KEY is missing" in error_content
 
     @pytest.mark.agents
     @pytest.mark.asyncio
@@ -281,110 +308,80 @@ class TestCryptoAdvisorAgentEnhanced:
         assert formatted[2]["role"] == "user"
 
     @pytest.mark.agents
-    def test_crypto_keyword_detection(self, crypto_advisor_agent):
+    @pytest.mark.parametrize("query,expected", [
+        # Queries that should trigger crypto data fetching
+        ("what is the price of bitcoin", True),
+        ("how is ethereum performing", True),
+        ("btc market analysis", True),
+        ("crypto market trends", True),
+        ("coin prices today", True),
+        # Queries that should not trigger crypto data fetching
+        ("what is the weather", False),
+        ("how to cook pasta", False),
+        ("explain quantum physics", False),
+    ])
+    def test_crypto_keyword_detection(self, query, expected):
         """Test crypto keyword detection in queries"""
-        # Test queries that should trigger crypto data fetching
-        crypto_queries = [
-            "what is the price of bitcoin",
-            "how is ethereum performing",
-            "btc market analysis",
-            "crypto market trends",
-            "coin prices today"
-        ]
-        
-        # Test queries that should not trigger crypto data fetching
-        non_crypto_queries = [
-            "what is the weather",
-            "how to cook pasta",
-            "explain quantum physics"
-        ]
-        
-        crypto_keywords = ["bitcoin", "btc", "ethereum", "eth", "price", "crypto", "market", "coin", "token"]
-        
-        for query in crypto_queries:
-            has_crypto_keyword = any(keyword in query.lower() for keyword in crypto_keywords)
-            assert has_crypto_keyword, f"Query '{query}' should contain crypto keywords"
-        
-        for query in non_crypto_queries:
-            has_crypto_keyword = any(keyword in query.lower() for keyword in crypto_keywords)
-            assert not has_crypto_keyword, f"Query '{query}' should not contain crypto keywords"
+        assert bool(_CRYPTO_KEYWORDS_RE.search(query)) is expected
+
+
+def _check_investment_advice(response, elapsed):
+    """Crypto queries should contain investment-related advice"""
+    content_lower = response["content"].lower()
+    assert any(word in content_lower for word in ["investment", "bitcoin", "crypto", "advice"])
+
+
+def _check_response_time(response, elapsed):
+    """Responses should be generated in reasonable time (less than 30 seconds)"""
+    assert elapsed < 30.0, f"Response took too long: {elapsed} seconds"
+
+
+# Prompts sent to the real agent in one batch, with the extra check for each
+_INTEGRATION_CASES = [
+    ("Hello, what can you help me with?", None),
+    ("What do you think about Bitcoin as an investment?", _check_investment_advice),
+    ("Give me a brief overview of cryptocurrency.", _check_response_time),
+]
 
 
 class TestCryptoAdvisorAgentIntegration:
     """Integration tests for Crypto Advisor Agent"""
 
-    @pytest.mark.integration
-    @pytest.mark.asyncio
-    async def test_agent_with_real_unified_api(self):
-        """Test agent with real unified API (requires API keys)"""
-        import os
+    @pytest.fixture(scope="module")
+    async def integration_responses(self):
+        """Send every integration prompt concurrently to one agent (requires API keys)"""
         if not os.getenv("GEMINI_API_KEY"):
             pytest.skip("Skipping integration test without GEMINI_API_KEY")
-        
-        agent = CryptoAdvisorAgent()
-        
-        # Test with a simple query that shouldn't trigger external API calls
-        messages = [
-            {"role": "user", "content": "Hello, what can you help me with?"}
-        ]
-        
-        try:
-            response = await agent.generate_response(messages)
-            assert response["role"] == "assistant"
-            assert len(response["content"]) > 0
-        except Exception as e:
-            pytest.skip(f"Integration test failed (expected without proper API setup): {e}")
 
-    @pytest.mark.integration
-    @pytest.mark.asyncio 
-    async def test_agent_crypto_query_integration(self):
-        """Test agent with crypto query (requires API keys)"""
-        import os
-        if not os.getenv("GEMINI_API_KEY"):
-            pytest.skip("Skipping integration test without GEMINI_API_KEY")
-        
         agent = CryptoAdvisorAgent()
-        
-        messages = [
-            {"role": "user", "content": "What do you think about Bitcoin as an investment?"}
-        ]
-        
-        try:
-            response = await agent.generate_response(messages)
-            assert response["role"] == "assistant"
-            assert len(response["content"]) > 0
-            # Should contain investment-related advice
-            content_lower = response["content"].lower()
-            assert any(word in content_lower for word in ["investment", "bitcoin", "crypto", "advice"])
-        except Exception as e:
-            pytest.skip(f"Integration test failed (expected without proper API setup): {e}")
+
+        start_time = time.perf_counter()
+        responses = await asyncio.gather(
+            *(
+                agent.generate_response([{"role": "user", "content": prompt}])
+                for prompt, _ in _INTEGRATION_CASES
+            ),
+            return_exceptions=True
+        )
+        return responses, time.perf_counter() - start_time
 
     @pytest.mark.integration
     @pytest.mark.asyncio
-    async def test_agent_performance(self):
-        """Test agent response performance"""
-        import time
-        import os
-        
-        if not os.getenv("GEMINI_API_KEY"):
-            pytest.skip("Skipping performance test without GEMINI_API_KEY")
-        
-        agent = CryptoAdvisorAgent()
-        
-        messages = [
-            {"role": "user", "content": "Give me a brief overview of cryptocurrency."}
-        ]
-        
-        start_time = time.time()
-        try:
-            response = await agent.generate_response(messages)
-            end_time = time.time()
-            
-            # Response should be generated in reasonable time (less than 30 seconds)
-            response_time = end_time - start_time
-            assert response_time < 30.0, f"Response took too long: {response_time} seconds"
-            
-            assert response["role"] == "assistant"
-            assert len(response["content"]) > 0
-        except Exception as e:
-            pytest.skip(f"Performance test failed (expected without proper API setup): {e}")
\ No newline at end of file
+    @pytest.mark.parametrize(
+        "idx",
+        range(len(_INTEGRATION_CASES)),
+        ids=["general", "crypto_query", "performance"]
+    )
+    async def test_agent_with_real_unified_api(self, integration_responses, idx):
+        """Test agent responses from the real API (requires API keys)"""
+        responses, elapsed = integration_responses
+        response = responses[idx]
+        if isinstance(response, Exception):
+            pytest.skip(f"Integration test failed (expected without proper API setup): {response}")
+
+        assert response["role"] == "assistant"
+        assert len(response["content"]) > 0
+
+        check = _INTEGRATION_CASES[idx][1]
+        if check is not None:
+            check(response, elapsed)
@@ -4,6 +4,20 @@ from pydantic import ValidationError
 from api.models import (AgentListResponse, AgentMetadata, AgentRequest,
                         AgentResponse, Message)
 
+# Payloads each model must reject: (model, constructor kwargs)
+_INVALID_CASES = [
+    pytest.param(Message, {"content": "Hello"}, id="message_missing_role"),
+    pytest.param(Message, {"role": "user"}, id="message_missing_content"),
+    pytest.param(AgentRequest, {"messages": [{"role": "user", "content": "Hello"}]}, id="request_missing_agent_id"),
+    pytest.param(AgentRequest, {"agent_id": "crypto_advisor"}, id="request_missing_messages"),
+    pytest.param(AgentResponse, {"message": {"role": "assistant", "content": "Hello"}}, id="response_missing_session_id"),
+    pytest.param(AgentResponse, {"session_id": "test-session"}, id="response_missing_message"),
+    pytest.param(AgentMetadata, {"agent_id": "crypto_advisor", "name": "Crypto Advisor"}, id="metadata_missing_description"),
+    pytest.param(AgentMetadata, {"agent_id": "crypto_advisor", "description": "A helpful agent"}, id="metadata_missing_name"),
+    pytest.param(AgentMetadata, {"name": "Crypto Advisor", "description": "A helpful agent"}, id="metadata_missing_agent_id"),
+    pytest.param(AgentListResponse, {}, id="list_missing_agents"),
+]
+
 
 def test_message_model():
     """Test Message model validation"""
@@ -13,14 +27,6 @@ def test_message_model():
     assert message.role == "user"
     assert message.content == "Hello"
 
-    # Missing role
-    with pytest.raises(ValidationError):
-        Message(content="Hello")
-
-    # Missing content
-    with pytest.raises(ValidationError):
-        Message(role="user")
-
 
 def test_agent_request_model():
     """Test AgentRequest model validation"""
@@ -53,13 +59,6 @@ def test_agent_request_model():
     assert request.session_id == "test-session"
     assert request.stream is True
 
-    # Missing required fields
-    with pytest.raises(ValidationError):
-        AgentRequest(messages=[{"role": "user", "content": "Hello"}])
-
-    with pytest.raises(ValidationError):
-        AgentRequest(agent_id="crypto_advisor")
-
 
 def test_agent_response_model():
     """Test AgentResponse model validation"""
@@ -83,13 +82,6 @@ def test_agent_response_model():
     response = AgentResponse(**full_data)
     assert response.user_id == "test-user"
 
-    # Missing required fields
-    with pytest.raises(ValidationError):
-        AgentResponse(message={"role": "assistant", "content": "Hello"})
-
-    with pytest.raises(ValidationError):
-        AgentResponse(session_id="test-session")
-
 
 def test_agent_metadata_model():
     """Test AgentMetadata model validation"""
@@ -104,16 +96,6 @@ def test_agent_metadata_model():
     assert metadata.name == "Crypto Advisor"
     assert metadata.description == "A helpful crypto advisor agent"
 
-    # Missing fields
-    with pytest.raises(ValidationError):
-        AgentMetadata(agent_id="crypto_advisor", name="Crypto Advisor")
-
-    with pytest.raises(ValidationError):
-        AgentMetadata(agent_id="crypto_advisor", description="A helpful agent")
-
-    with pytest.raises(ValidationError):
-        AgentMetadata(name="Crypto Advisor", description="A helpful agent")
-
 
 def test_agent_list_response_model():
     """Test AgentListResponse model validation"""
@@ -142,6 +124,9 @@ def test_agent_list_response_model():
     response = AgentListResponse(**empty_data)
     assert len(response.agents) == 0
 
-    # Missing required field
+
+@pytest.mark.parametrize("model, kwargs", _INVALID_CASES)
+def test_model_rejects_missing_fields(model, kwargs):
+    """Test models raise ValidationError when required fields are missing"""
     with pytest.raises(ValidationError):
-        AgentListResponse()
+        model(**kwargs)
@@ -2,8 +2,11 @@
 Test cases for Unified Crypto API Service
 """
 
+import json
+import os
+
 import pytest
-from unittest.mock import AsyncMock, MagicMock, patch
+from unittest.mock import patch
 import httpx
 from datetime import datetime
 
@@ -16,110 +19,206 @@ from app.services.unified_crypto_api import (
 )
 
 
-class TestUnifiedCryptoAPI:
-    """Test suite for UnifiedCryptoAPI class"""
-
-    @pytest.fixture
-    def api_instance(self):
-        """Create UnifiedCryptoAPI instance for testing"""
-        return UnifiedCryptoAPI()
-
-    @pytest.fixture
-    def mock_httpx_client(self):
-        """Mock httpx AsyncClient"""
-        mock_client = AsyncMock(spec=httpx.AsyncClient)
-        return mock_client
-
-    @pytest.fixture
-    def sample_dexscreener_response(self):
-        """Sample DexScreener API response"""
-        return {
-            "pairs": [
-                {
-                    "pairAddress": "0x1234567890abcdef",
-                    "baseToken": {"symbol": "ETH"},
-                    "quoteToken": {"symbol": "USDC"},
-                    "priceUsd": "3200.50",
-                    "volume": {"h24": "5000000"},
-                    "liquidity": {"usd": "10000000"},
-                    "priceChange": {"h24": "1.8"},
-                    "dexId": "uniswap",
-                    "chainId": "ethereum"
-                }
-            ]
+# Raw API payloads, built once at import; the service only reads them
+
+# Sample DexScreener API response
+_DEXSCREENER_RESPONSE = {
+    "pairs": [
+        {
+            "pairAddress": "0x1234567890abcdef",
+            "baseToken": {"symbol": "ETH"},
+            "quoteToken": {"symbol": "USDC"},
+            "priceUsd": "3200.50",
+            "volume": {"h24": "5000000"},
+            "liquidity": {"usd": "10000000"},
+            "priceChange": {"h24": "1.8"},
+            "dexId": "uniswap",
+            "chainId": "ethereum"
         }
-
-    @pytest.fixture
-    def sample_defillama_protocols_response(self):
-        """Sample DefiLlama protocols response"""
-        return [
-            {
-                "name": "Uniswap",
-                "tvl": 8500000000,
-                "chain": "Ethereum", 
-                "category": "DEX",
-                "change_1d": 2.1,
-                "change_7d": -0.8,
-                "mcap": 15000000000
-            },
-            {
-                "name": "Aave",
-                "tvl": 12000000000,
-                "chain": "Ethereum",
-                "category": "Lending",
-                "change_1d": 1.5,
-                "change_7d": 3.2,
-                "mcap": 8000000000
+    ]
+}
+
+# Sample DefiLlama protocols response
+_DEFILLAMA_PROTOCOLS_RESPONSE = [
+    {
+        "name": "Uniswap",
+        "tvl": 8500000000,
+        "chain": "Ethereum", 
+        "category": "DEX",
+        "change_1d": 2.1,
+        "change_7d": -0.8,
+        "mcap": 15000000000
+    },
+    {
+        "name": "Aave",
+        "tvl": 12000000000,
+        "chain": "Ethereum",
+        "category": "Lending",
+        "change_1d": 1.5,
+        "change_7d": 3.2,
+        "mcap": 8000000000
+    }
+]
+
+# Sample GeckoTerminal API response
+_GECKOTERMINAL_RESPONSE = {
+    "data": [
+        {
+            "id": "eth_0x1234567890abcdef",
+            "attributes": {
+                "base_token_symbol": "ETH",
+                "quote_token_symbol": "USDC",
+                "base_token_price_usd": "3200.50",
+                "volume_usd": {"h24": "5000000"},
+                "reserve_in_usd": "10000000",
+                "price_change_percentage": {"h24": "1.8"},
+                "dex_id": "uniswap_v3"
             }
-        ]
-
-    @pytest.fixture
-    def sample_geckoterminal_response(self):
-        """Sample GeckoTerminal API response"""
-        return {
-            "data": [
-                {
-                    "id": "eth_0x1234567890abcdef",
-                    "attributes": {
-                        "base_token_symbol": "ETH",
-                        "quote_token_symbol": "USDC",
-                        "base_token_price_usd": "3200.50",
-                        "volume_usd": {"h24": "5000000"},
-                        "reserve_in_usd": "10000000",
-                        "price_change_percentage": {"h24": "1.8"},
-                        "dex_id": "uniswap_v3"
-                    }
-                }
-            ]
         }
+    ]
+}
+
+# Sample CoinGecko API response
+_COINGECKO_RESPONSE = {
+    "bitcoin": {
+        "usd": 45000.0,
+        "usd_24h_change": 2.5,
+        "usd_market_cap": 850000000000,
+        "usd_24h_vol": 25000000000
+    },
+    "ethereum": {
+        "usd": 3200.0,
+        "usd_24h_change": 1.8,
+        "usd_market_cap": 380000000000,
+        "usd_24h_vol": 15000000000
+    }
+}
+
+# The payloads as JSON bytes, encoded once and parsed per call the way httpx does
+_DEXSCREENER_CONTENT = json.dumps(_DEXSCREENER_RESPONSE).encode()
+_DEFILLAMA_PROTOCOLS_CONTENT = json.dumps(_DEFILLAMA_PROTOCOLS_RESPONSE).encode()
+_GECKOTERMINAL_CONTENT = json.dumps(_GECKOTERMINAL_RESPONSE).encode()
+_COINGECKO_CONTENT = json.dumps(_COINGECKO_RESPONSE).encode()
+
+# Trusted sample results for the aggregate methods, built once and only read by tests
+_DEXSCREENER_PAIR = TradingPair(
+    pair_address="0x123",
+    base_token="ETH",
+    quote_token="USDC",
+    price_usd=3200.0,
+    volume_24h=5000000,
+    source="dexscreener"
+)
+
+_GECKOTERMINAL_PAIR = TradingPair(
+    pair_address="0x123",
+    base_token="ETH",
+    quote_token="USDC",
+    price_usd=3200.0,
+    volume_24h=5000000,
+    source="geckoterminal"
+)
+
+_DEFILLAMA_PROTOCOL = ProtocolData(
+    name="Uniswap",
+    tvl=8500000000,
+    chain="Ethereum",
+    source="defillama"
+)
+
+_COINGECKO_PRICE = TokenPrice(
+    symbol="bitcoin",
+    price_usd=45000.0,
+    source="coingecko"
+)
 
-    @pytest.fixture
-    def sample_coingecko_response(self):
-        """Sample CoinGecko API response"""
-        return {
-            "bitcoin": {
-                "usd": 45000.0,
-                "usd_24h_change": 2.5,
-                "usd_market_cap": 850000000000,
-                "usd_24h_vol": 25000000000
-            },
-            "ethereum": {
-                "usd": 3200.0,
-                "usd_24h_change": 1.8,
-                "usd_market_cap": 380000000000,
-                "usd_24h_vol": 15000000000
-            }
-        }
+
+# List-returning data source methods and their expected parse of a sample payload:
+# (method, args, response body, result size, item type, first item attributes)
+_LIST_CASES = [
+    pytest.param(
+        "search_pairs_dexscreener", ("ETH",), _DEXSCREENER_CONTENT, 1, TradingPair,
+        {"base_token": "ETH", "quote_token": "USDC", "price_usd": 3200.50, "source": "dexscreener"},
+        id="dexscreener_search"
+    ),
+    pytest.param(
+        "get_protocols_defillama", (), _DEFILLAMA_PROTOCOLS_CONTENT, 2, ProtocolData,
+        {"name": "Uniswap", "tvl": 8500000000, "source": "defillama"},
+        id="defillama_protocols"
+    ),
+    pytest.param(
+        "get_trending_pools_geckoterminal", ("eth",), _GECKOTERMINAL_CONTENT, 1, TradingPair,
+        {"base_token": "ETH", "source": "geckoterminal"},
+        id="geckoterminal_trending"
+    ),
+    pytest.param(
+        "search_pools_geckoterminal", ("ETH", "eth"), _GECKOTERMINAL_CONTENT, 1, TradingPair,
+        {},
+        id="geckoterminal_search"
+    ),
+]
+
+
+class _FakeResponse:
+    """Minimal stand-in for httpx.Response; json() and raise_for_status() are sync like the real ones"""
+
+    __slots__ = ("content", "status_code")
+
+    def __init__(self, content: bytes, status_code=200):
+        self.content = content
+        self.status_code = status_code
+
+    def json(self):
+        return json.loads(self.content)
+
+    def raise_for_status(self):
+        return None
+
+
+def _returning(value):
+    """Coroutine function standing in for a service method that returns value"""
+    async def method(*args, **kwargs):
+        return value
+    return method
+
+
+def _wire_get(api, client, response):
+    """Route the API's GET requests to client, answering with response or raising it if it is an exception"""
+    if isinstance(response, Exception):
+        client.get.side_effect = response
+    else:
+        client.get.return_value = response
+    api.session = client
+
+
+class TestUnifiedCryptoAPI:
+    """Test suite for UnifiedCryptoAPI class"""
+
+    @pytest.fixture(scope="session")
+    async def api_instance(self):
+        """Create one UnifiedCryptoAPI instance shared by every test, closing its client at the end"""
+        api = UnifiedCryptoAPI()
+        yield api
+        await api.close()
+
+    @pytest.fixture(autouse=True)
+    def restore_session(self, api_instance):
+        """Put the real HTTP client back after tests that swap in a mock"""
+        session = api_instance.session
+        yield
+        api_instance.session = session
 
     def test_api_initialization(self, api_instance):
         """Test API initialization"""
         assert api_instance is not None
-        assert hasattr(api_instance, 'session')
-        assert hasattr(api_instance, 'apis')
+        assert {'session', 'apis'} <= vars(api_instance).keys()
         assert len(api_instance.apis) == 4  # 4 data sources
 
-    def test_get_headers(self, api_instance):
+    def test_get_headers(self, api_instance, monkeypatch):
         """Test header generation for different APIs"""
+        monkeypatch.setenv("COINGECKO_API_KEY", "test_key")
+        monkeypatch.setenv("GECKOTERMINAL_API_KEY", "test_key")
+
         # Test base headers
         headers = api_instance._get_headers(DataSource.DEXSCREENER)
         assert "User-Agent" in headers
@@ -127,16 +226,14 @@ class TestUnifiedCryptoAPI:
         assert headers["Accept"] == "application/json"
 
         # Test CoinGecko headers with API key
-        with patch.dict('os.environ', {'COINGECKO_API_KEY': 'test_key'}):
-            headers = api_instance._get_headers(DataSource.COINGECKO)
-            assert "x-cg-demo-api-key" in headers
-            assert headers["x-cg-demo-api-key"] == "test_key"
+        headers = api_instance._get_headers(DataSource.COINGECKO)
+        assert "x-cg-demo-api-key" in headers
+        assert headers["x-cg-demo-api-key"] == "test_key"
 
         # Test GeckoTerminal headers with API key
-        with patch.dict('os.environ', {'GECKOTERMINAL_API_KEY': 'test_key'}):
-            headers = api_instance._get_headers(DataSource.GECKOTERMINAL)
-            assert "Authorization" in headers
-            assert headers["Authorization"] == "Bearer test_key"
+        headers = api_instance._get_headers(DataSource.GECKOTERMINAL)
+        assert "Authorization" in headers
+        assert headers["Authorization"] == "Bearer test_key"
 
     def test_get_api_status(self, api_instance):
         """Test API status method"""
@@ -146,112 +243,74 @@ class TestUnifiedCryptoAPI:
         }):
             status = api_instance.get_api_status()
             
-            assert isinstance(status, dict)
+            assert type(status) is dict
             assert len(status) == 4
-            assert 'dexscreener' in status
-            assert 'defillama' in status
-            assert 'geckoterminal' in status
-            assert 'coingecko' in status
+            assert {'dexscreener', 'defillama', 'geckoterminal', 'coingecko'} <= status.keys()
             
             # Check status structure
             for source, config in status.items():
-                assert 'configured' in config
-                assert 'base_url' in config
-                assert 'has_api_key' in config
+                assert {'configured', 'base_url', 'has_api_key'} <= config.keys()
 
-    @pytest.mark.asyncio
     async def test_close_session(self, api_instance, mock_httpx_client):
         """Test session closing"""
         api_instance.session = mock_httpx_client
         await api_instance.close()
         mock_httpx_client.aclose.assert_called_once()
 
-    @pytest.mark.asyncio
-    async def test_search_pairs_dexscreener_success(self, api_instance, mock_httpx_client, sample_dexscreener_response):
-        """Test successful DexScreener pair search"""
-        # Mock the response
-        mock_response = AsyncMock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = sample_dexscreener_response
-        mock_response.raise_for_status.return_value = None
-        mock_httpx_client.get.return_value = mock_response
+    @pytest.mark.parametrize("method, args, content, size, expected_cls, attrs", _LIST_CASES)
+    async def test_list_method_success(self, api_instance, mock_httpx_client, method, args, content, size, expected_cls, attrs):
+        """Test list-returning data source methods parsing a successful response"""
+        _wire_get(api_instance, mock_httpx_client, _FakeResponse(content))
         
-        api_instance.session = mock_httpx_client
+        result = await getattr(api_instance, method)(*args)
         
-        result = await api_instance.search_pairs_dexscreener("ETH")
+        assert type(result) is list
+        assert len(result) == size
+        assert type(result[0]) is expected_cls
+        for attr, value in attrs.items():
+            assert getattr(result[0], attr) == value
+
+    async def test_get_pair_dexscreener_success(self, api_instance, mock_httpx_client):
+        """Test successful DexScreener pair retrieval"""
+        _wire_get(api_instance, mock_httpx_client, _FakeResponse(_DEXSCREENER_CONTENT))
+        
+        result = await api_instance.get_pair_dexscreener("0x1234567890abcdef")
+        
+        assert type(result) is TradingPair
+        assert result.pair_address == "0x1234567890abcdef"
+        assert result.base_token == "ETH"
+
+    async def test_get_prices_coingecko_success(self, api_instance, mock_httpx_client):
+        """Test successful CoinGecko price retrieval"""
+        _wire_get(api_instance, mock_httpx_client, _FakeResponse(_COINGECKO_CONTENT))
         
-        assert isinstance(result, list)
-        assert len(result) == 1
-        assert isinstance(result[0], TradingPair)
-        assert result[0].base_token == "ETH"
-        assert result[0].quote_token == "USDC"
-        assert result[0].price_usd == 3200.50
-        assert result[0].source == "dexscreener"
-
-    @pytest.mark.asyncio
+        result = await api_instance.get_prices_coingecko(["bitcoin", "ethereum"], ["usd"])
+        
+        assert type(result) is dict
+        assert len(result) == 2
+        assert "bitcoin_usd" in result
+        assert "ethereum_usd" in result
+        assert type(result["bitcoin_usd"]) is TokenPrice
+        assert result["bitcoin_usd"].price_usd == 45000.0
+        assert result["bitcoin_usd"].source == "coingecko"
+
     async def test_search_pairs_dexscreener_error(self, api_instance, mock_httpx_client):
         """Test DexScreener pair search error handling"""
-        mock_httpx_client.get.side_effect = httpx.RequestError("Network error")
-        api_instance.session = mock_httpx_client
+        _wire_get(api_instance, mock_httpx_client, httpx.RequestError("Network error"))
         
         result = await api_instance.search_pairs_dexscreener("ETH")
         
-        assert isinstance(result, list)
+        assert type(result) is list
         assert len(result) == 0
 
-    @pytest.mark.asyncio
-    async def test_get_pair_dexscreener_success(self, api_instance, mock_httpx_client, sample_dexscreener_response):
-        """Test successful DexScreener specific pair retrieval"""
-        mock_response = AsyncMock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = sample_dexscreener_response
-        mock_response.raise_for_status.return_value = None
-        mock_httpx_client.get.return_value = mock_response
-        
-        api_instance.session = mock_httpx_client
-        
-        result = await api_instance.get_pair_dexscreener("0x1234567890abcdef")
-        
-        assert isinstance(result, TradingPair)
-        assert result.pair_address == "0x1234567890abcdef"
-        assert result.base_token == "ETH"
-
-    @pytest.mark.asyncio
     async def test_get_pair_dexscreener_not_found(self, api_instance, mock_httpx_client):
         """Test DexScreener pair not found"""
-        mock_response = AsyncMock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {"pairs": []}
-        mock_response.raise_for_status.return_value = None
-        mock_httpx_client.get.return_value = mock_response
-        
-        api_instance.session = mock_httpx_client
+        _wire_get(api_instance, mock_httpx_client, _FakeResponse(b'{"pairs": []}'))
         
         result = await api_instance.get_pair_dexscreener("0xinvalid")
         
         assert result is None
 
-    @pytest.mark.asyncio
-    async def test_get_protocols_defillama_success(self, api_instance, mock_httpx_client, sample_defillama_protocols_response):
-        """Test successful DefiLlama protocols retrieval"""
-        mock_response = AsyncMock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = sample_defillama_protocols_response
-        mock_response.raise_for_status.return_value = None
-        mock_httpx_client.get.return_value = mock_response
-        
-        api_instance.session = mock_httpx_client
-        
-        result = await api_instance.get_protocols_defillama()
-        
-        assert isinstance(result, list)
-        assert len(result) == 2
-        assert isinstance(result[0], ProtocolData)
-        assert result[0].name == "Uniswap"
-        assert result[0].tvl == 8500000000
-        assert result[0].source == "defillama"
-
-    @pytest.mark.asyncio
     async def test_get_protocol_tvl_defillama_success(self, api_instance, mock_httpx_client):
         """Test successful DefiLlama specific protocol retrieval"""
         protocol_data = {
@@ -261,21 +320,14 @@ class TestUnifiedCryptoAPI:
             "category": "DEX"
         }
         
-        mock_response = AsyncMock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = protocol_data
-        mock_response.raise_for_status.return_value = None
-        mock_httpx_client.get.return_value = mock_response
-        
-        api_instance.session = mock_httpx_client
+        _wire_get(api_instance, mock_httpx_client, _FakeResponse(json.dumps(protocol_data).encode()))
         
         result = await api_instance.get_protocol_tvl_defillama("uniswap")
         
-        assert isinstance(result, ProtocolData)
+        assert type(result) is ProtocolData
         assert result.name == "Uniswap"
         assert result.tvl == 8500000000
 
-    @pytest.mark.asyncio
     async def test_get_chain_tvl_defillama_success(self, api_instance, mock_httpx_client):
         """Test successful DefiLlama chain TVL retrieval"""
         chains_data = [
@@ -287,133 +339,38 @@ class TestUnifiedCryptoAPI:
             }
         ]
         
-        mock_response = AsyncMock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = chains_data
-        mock_response.raise_for_status.return_value = None
-        mock_httpx_client.get.return_value = mock_response
-        
-        api_instance.session = mock_httpx_client
+        _wire_get(api_instance, mock_httpx_client, _FakeResponse(json.dumps(chains_data).encode()))
         
         result = await api_instance.get_chain_tvl_defillama("ethereum")
         
-        assert isinstance(result, dict)
+        assert type(result) is dict
         assert result["chain"] == "Ethereum"
         assert result["tvl"] == 50000000000
         assert result["source"] == "defillama"
 
-    @pytest.mark.asyncio
-    async def test_get_trending_pools_geckoterminal_success(self, api_instance, mock_httpx_client, sample_geckoterminal_response):
-        """Test successful GeckoTerminal trending pools retrieval"""
-        mock_response = AsyncMock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = sample_geckoterminal_response
-        mock_response.raise_for_status.return_value = None
-        mock_httpx_client.get.return_value = mock_response
-        
-        api_instance.session = mock_httpx_client
-        
-        result = await api_instance.get_trending_pools_geckoterminal("eth")
-        
-        assert isinstance(result, list)
-        assert len(result) == 1
-        assert isinstance(result[0], TradingPair)
-        assert result[0].base_token == "ETH"
-        assert result[0].source == "geckoterminal"
-
-    @pytest.mark.asyncio
-    async def test_search_pools_geckoterminal_success(self, api_instance, mock_httpx_client, sample_geckoterminal_response):
-        """Test successful GeckoTerminal pool search"""
-        mock_response = AsyncMock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = sample_geckoterminal_response
-        mock_response.raise_for_status.return_value = None
-        mock_httpx_client.get.return_value = mock_response
-        
-        api_instance.session = mock_httpx_client
-        
-        result = await api_instance.search_pools_geckoterminal("ETH", "eth")
-        
-        assert isinstance(result, list)
-        assert len(result) == 1
-        assert isinstance(result[0], TradingPair)
-
-    @pytest.mark.asyncio
-    async def test_get_prices_coingecko_success(self, api_instance, mock_httpx_client, sample_coingecko_response):
-        """Test successful CoinGecko prices retrieval"""
-        mock_response = AsyncMock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = sample_coingecko_response
-        mock_response.raise_for_status.return_value = None
-        mock_httpx_client.get.return_value = mock_response
-        
-        api_instance.session = mock_httpx_client
-        
-        result = await api_instance.get_prices_coingecko(["bitcoin", "ethereum"], ["usd"])
-        
-        assert isinstance(result, dict)
-        assert "bitcoin_usd" in result
-        assert "ethereum_usd" in result
-        assert isinstance(result["bitcoin_usd"], TokenPrice)
-        assert result["bitcoin_usd"].price_usd == 45000.0
-        assert result["bitcoin_usd"].source == "coingecko"
-
-    @pytest.mark.asyncio
-    async def test_search_tokens_unified_success(self, api_instance):
+    async def test_search_tokens_unified_success(self, api_instance, monkeypatch):
         """Test unified token search"""
         # Mock the individual search methods
-        sample_pair = TradingPair(
-            pair_address="0x123",
-            base_token="ETH",
-            quote_token="USDC", 
-            price_usd=3200.0,
-            volume_24h=5000000,
-            source="dexscreener"
-        )
-        
-        api_instance.search_pairs_dexscreener = AsyncMock(return_value=[sample_pair])
-        api_instance.search_pools_geckoterminal = AsyncMock(return_value=[])
+        monkeypatch.setattr(api_instance, "search_pairs_dexscreener", _returning([_DEXSCREENER_PAIR]))
+        monkeypatch.setattr(api_instance, "search_pools_geckoterminal", _returning([]))
         
         result = await api_instance.search_tokens_unified("ETH")
         
-        assert isinstance(result, dict)
+        assert type(result) is dict
         assert "dexscreener_pairs" in result
         assert "geckoterminal_pairs" in result
         assert len(result["dexscreener_pairs"]) == 1
 
-    @pytest.mark.asyncio
-    async def test_get_market_overview_success(self, api_instance):
+    async def test_get_market_overview_success(self, api_instance, monkeypatch):
         """Test market overview retrieval"""
         # Mock the individual methods
-        sample_pair = TradingPair(
-            pair_address="0x123",
-            base_token="ETH", 
-            quote_token="USDC",
-            price_usd=3200.0,
-            volume_24h=5000000,
-            source="geckoterminal"
-        )
-        
-        sample_protocol = ProtocolData(
-            name="Uniswap",
-            tvl=8500000000,
-            chain="Ethereum",
-            source="defillama"
-        )
-        
-        sample_price = TokenPrice(
-            symbol="bitcoin",
-            price_usd=45000.0,
-            source="coingecko"
-        )
-        
-        api_instance.get_trending_pools_geckoterminal = AsyncMock(return_value=[sample_pair])
-        api_instance.get_protocols_defillama = AsyncMock(return_value=[sample_protocol])
-        api_instance.get_prices_coingecko = AsyncMock(return_value={"bitcoin_usd": sample_price})
+        monkeypatch.setattr(api_instance, "get_trending_pools_geckoterminal", _returning([_GECKOTERMINAL_PAIR]))
+        monkeypatch.setattr(api_instance, "get_protocols_defillama", _returning([_DEFILLAMA_PROTOCOL]))
+        monkeypatch.setattr(api_instance, "get_prices_coingecko", _returning({"bitcoin_usd": _COINGECKO_PRICE}))
         
         result = await api_instance.get_market_overview()
         
-        assert isinstance(result, dict)
+        assert type(result) is dict
         assert "trending_pairs" in result
         assert "top_protocols" in result
         assert "market_summary" in result
@@ -482,76 +439,46 @@ class TestDataModels:
         assert protocol.source == "defillama"
 
 
+@pytest.mark.skipif(not os.getenv("RUN_INTEGRATION"), reason="set RUN_INTEGRATION=1 to enable network tests")
 class TestUnifiedCryptoAPIIntegration:
     """Integration tests for UnifiedCryptoAPI"""
 
     @pytest.mark.integration
-    @pytest.mark.asyncio
-    async def test_real_api_integration(self):
+    async def test_real_api_integration(self, live_unified_api):
         """Test with real API calls (requires internet)"""
-        import os
-        if os.getenv("CI"):
-            pytest.skip("Skipping real API integration test in CI")
-        
-        api = UnifiedCryptoAPI()
-        
-        try:
-            # Test CoinGecko (should work without API key for basic endpoints)
-            prices = await api.get_prices_coingecko(["bitcoin"], ["usd"])
-            if prices:  # Only assert if we got data
-                assert isinstance(prices, dict)
-                assert len(prices) > 0
-                
-            # Test DexScreener (should work without API key)
-            pairs = await api.search_pairs_dexscreener("ETH")
-            assert isinstance(pairs, list)
+        # Test CoinGecko (should work without API key for basic endpoints)
+        prices = await live_unified_api.get_prices_coingecko(["bitcoin"], ["usd"])
+        if prices:  # Only assert if we got data
+            assert isinstance(prices, dict)
+            assert len(prices) > 0
             
-        except Exception as e:
-            pytest.skip(f"Real API integration test failed (expected in test environment): {e}")
-        finally:
-            await api.close()
+        # Test DexScreener (should work without API key)
+        pairs = await live_unified_api.search_pairs_dexscreener("ETH")
+        assert isinstance(pairs, list)
 
     @pytest.mark.integration
-    @pytest.mark.asyncio
-    async def test_api_error_resilience(self):
+    async def test_api_error_resilience(self, live_unified_api):
         """Test API resilience to errors"""
-        api = UnifiedCryptoAPI()
+        # Test with invalid data that should return empty results
+        pairs = await live_unified_api.search_pairs_dexscreener("")
+        assert isinstance(pairs, list)
         
-        try:
-            # Test with invalid data that should return empty results
-            pairs = await api.search_pairs_dexscreener("")
-            assert isinstance(pairs, list)
-            
-            protocols = await api.get_protocols_defillama()
-            assert isinstance(protocols, list)
-            
-        except Exception as e:
-            pytest.skip(f"Error resilience test failed: {e}")
-        finally:
-            await api.close()
+        protocols = await live_unified_api.get_protocols_defillama()
+        assert isinstance(protocols, list)
 
     @pytest.mark.integration
-    @pytest.mark.asyncio
-    async def test_concurrent_api_calls(self):
+    async def test_concurrent_api_calls(self, live_unified_api):
         """Test concurrent API calls"""
         import asyncio
         
-        api = UnifiedCryptoAPI()
+        # Make multiple concurrent calls
+        tasks = [
+            live_unified_api.search_pairs_dexscreener("ETH"),
+            live_unified_api.get_protocols_defillama(),
+            live_unified_api.get_prices_coingecko(["bitcoin"], ["usd"])
+        ]
         
-        try:
-            # Make multiple concurrent calls
-            tasks = [
-                api.search_pairs_dexscreener("ETH"),
-                api.get_protocols_defillama(),
-                api.get_prices_coingecko(["bitcoin"], ["usd"])
-            ]
-            
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-            
-            # Check that we got results (or exceptions, which is also acceptable)
-            assert len(results) == 3
-            
-        except Exception as e:
-            pytest.skip(f"Concurrent API test failed: {e}")
-        finally:
-            await api.close()
\ No newline at end of file
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        
+        # Check that we got results (or exceptions, which is also acceptable)
+        assert len(results) == 3